@@ -4,10 +4,19 @@ Convert .streamlit/secrets.toml to Railway environment variables
 Run this script to generate the environment variables for Railway deployment
 """
 
-import toml
 import json
+import sys
 from pathlib import Path
 
+try:
+    import rtoml as _toml
+except ImportError:
+    try:
+        import tomllib as _toml
+    except ImportError:
+        # Python < 3.11 without rtoml
+        import toml as _toml
+
 def convert_secrets_to_env():
     """Convert secrets.toml to Railway environment variables format."""
     
@@ -19,8 +28,7 @@ def convert_secrets_to_env():
         return
     
     try:
-        with open(secrets_path, 'r') as f:
-            secrets = toml.load(f)
+        secrets = _toml.loads(secrets_path.read_text(encoding="utf-8"))
     except Exception as e:
         print(f"❌ Error reading secrets.toml: {e}")
         return
@@ -36,7 +44,6 @@ def convert_secrets_to_env():
         for username, password in secrets['passwords'].items():
             env_key = f"STREAMLIT_PASSWORDS_{username.upper()}"
             env_vars[env_key] = password
-            print(f"{env_key}={password}")
     
     # Handle all other keys (direct mapping - no prefix needed)
     for key, value in secrets.items():
@@ -53,7 +60,10 @@ def convert_secrets_to_env():
         
         env_key = key.upper()
         env_vars[env_key] = value
-        print(f"{env_key}={value}")
+    
+    # Print and save all variables in one write each
+    env_text = "".join(f"{key}={value}\n" for key, value in env_vars.items())
+    sys.stdout.write(env_text)
     
     print("=" * 60)
     print("✅ Conversion complete!")
@@ -65,9 +75,7 @@ def convert_secrets_to_env():
     
     # Save to file for easy copying
     output_file = "railway_env_vars.txt"
-    with open(output_file, 'w') as f:
-        for key, value in env_vars.items():
-            f.write(f"{key}={value}\n")
+    Path(output_file).write_text(env_text)
     
     print(f"\n💾 Environment variables also saved to: {output_file}")
     print("You can copy-paste from this file into Railway!")
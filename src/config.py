@@ -1,9 +1,14 @@
 """
 Configuration settings for the PDF to Email Converter app.
 """
+import logging
 import streamlit as st
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
 
 # Base directory
 BASE_DIR = Path(__file__).parent
@@ -11,37 +16,25 @@ BASE_DIR = Path(__file__).parent
 # Data directory for temporary files
 DATA_DIR = BASE_DIR / "data"
 
-def get_secret(key: str, default: str = "") -> str:
-    """Get value from st.secrets."""
-    try:
-        if hasattr(st, 'secrets') and key in st.secrets:
-            return st.secrets[key]
-    except:
-        pass
-    return default
-
-def get_secret_list(key: str, default: list = None) -> list:
-    """Get list value from st.secrets."""
-    if default is None:
-        default = []
-    try:
-        if hasattr(st, 'secrets') and key in st.secrets:
-            return st.secrets[key]
-    except:
-        pass
-    return default
+# Read st.secrets once; each access otherwise goes back through Streamlit
+try:
+    _SECRETS = dict(st.secrets) if hasattr(st, 'secrets') else {}
+except (KeyError, AttributeError, FileNotFoundError) as e:
+    # Streamlit raises StreamlitSecretNotFoundError (a FileNotFoundError) both
+    # for a missing secrets file and for one that fails to parse as TOML, so
+    # log it rather than let a syntax error pass as "not set in secrets"
+    logger.warning("Could not load st.secrets, falling back to defaults: %s", e)
+    _SECRETS = {}
 
-def get_secret_bool(key: str, default: bool = True) -> bool:
-    """Get boolean value from st.secrets."""
-    try:
-        if hasattr(st, 'secrets') and key in st.secrets:
-            return st.secrets[key]
-    except:
-        pass
-    return default
+def get_secret(key: str, default: Any = "", cast: Optional[Callable[[Any], Any]] = None) -> Any:
+    """Get value from st.secrets, optionally converted with ``cast``."""
+    if key not in _SECRETS:
+        return default
+    value = _SECRETS[key]
+    return cast(value) if cast else value
 
-# Email configuration
-EMAIL_CONFIG = {
+# Email configuration (read-only; validate_config() caches against it)
+EMAIL_CONFIG = MappingProxyType({
     "smtp_hosts": {
         "gmail": "smtp.gmail.com",
         "microsoft": "smtp.office365.com",
@@ -53,14 +46,14 @@ EMAIL_CONFIG = {
     "sender_type": get_secret("sender_type", "microsoft"),
     "recipient_email": get_secret("recipient_email", ""),
     # Recipient options for dropdown
-    "recipient_options": get_secret_list("recipient_options", ["sgoldman@mpmcapital.com"]),
+    "recipient_options": get_secret("recipient_options", ["sgoldman@mpmcapital.com"], list),
     # Microsoft Graph API configuration
     "microsoft_tenant_id": get_secret("microsoft_tenant_id", ""),
     "microsoft_client_id": get_secret("microsoft_client_id", ""),
     "microsoft_client_secret": get_secret("microsoft_client_secret", ""),
     # Configuration for Microsoft Graph attachment method
-    "use_mime_attachments": get_secret_bool("use_mime_attachments", True),
-}
+    "use_mime_attachments": get_secret("use_mime_attachments", True, bool),
+})
 
 # App configuration
 APP_CONFIG = {
@@ -73,8 +66,13 @@ APP_CONFIG = {
 }
 
 # Validation
+@lru_cache(maxsize=1)
 def validate_config() -> Dict[str, Any]:
-    """Validate configuration and return any issues."""
+    """Validate configuration and return any issues.
+
+    EMAIL_CONFIG is fixed at import, so the result is cached for the process
+    lifetime; picking up changed secrets requires restarting the app.
+    """
     issues = {}
     
     if not EMAIL_CONFIG["sender_email"]:
@@ -1,21 +1,71 @@
 """
 Email sending utilities for the PDF converter app.
 """
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List
-from io import BytesIO
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, List
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 import streamlit as st
-import msal
-import requests
 import json
 import base64
+import time
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
 
 from config import EMAIL_CONFIG
 
+if TYPE_CHECKING:
+    # Only for annotations; both are imported lazily at first use
+    import msal
+    import requests
+
+
+def _next_friday(now: datetime) -> str:
+    """Return the date of the upcoming Friday (today if it is Friday)."""
+    return (now + timedelta((4 - now.weekday()) % 7)).strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=1)
+def _get_msal_app(tenant_id: str, client_id: str, client_secret: str) -> "msal.ConfidentialClientApplication":
+    """Return a shared MSAL app so its in-memory token cache survives across sends."""
+    # Imported here so SMTP-only deployments never pay for msal/cryptography
+    import msal
+
+    return msal.ConfidentialClientApplication(
+        client_id,
+        authority=f"https://login.microsoftonline.com/{tenant_id}",
+        client_credential=client_secret,
+    )
+
+
+@dataclass
+class PageImage:
+    """A rendered page image, with its base64 form computed once on demand."""
+    data: bytes
+    
+    @cached_property
+    def b64(self) -> str:
+        """Base64 text of the image, shared by preview, compose and send."""
+        return base64.b64encode(self.data).decode('ascii')
+
+
+# Subject date formatter and subject topic label for each topic type
+_SUBJECT_DATES = {
+    "": (lambda now: now.strftime("%Y-%m-%d"), ""),
+    "Non-Onc": (_next_friday, "Non-Onc"),
+    "Onc": (_next_friday, "Onc"),
+    "No Date": (lambda now: "", ""),
+}
+
 
 class EmailSender:
     """Handles email composition and sending."""
@@ -34,6 +84,32 @@ class EmailSender:
         self.microsoft_client_secret = EMAIL_CONFIG["microsoft_client_secret"]
         # Configuration for Microsoft Graph attachment method
         self.use_mime_attachments = EMAIL_CONFIG.get("use_mime_attachments", True)
+        # Cached Microsoft Graph access token and its expiry (epoch seconds)
+        self._token = None
+        self._token_expiry = 0.0
+        # Keep-alive HTTP session for Graph calls, created on first use
+        self._session = None
+        # Sender type and attachment method are fixed per instance, so pick
+        # the compose/send implementations once instead of branching per call
+        if self.sender_type == "microsoft_graph" and self.use_mime_attachments:
+            self._compose = self._compose_graph_mime
+            self._send = self.send_email_microsoft_graph_with_attachments
+        elif self.sender_type == "microsoft_graph":
+            self._compose = self._compose_graph_base64
+            self._send = self.send_email_microsoft_graph_simple
+        else:
+            self._compose = self._compose_smtp
+            self._send = self._send_smtp
+    
+    def _get_session(self) -> "requests.Session":
+        """Return the pooled HTTP session used for Microsoft Graph calls."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            
+            self._session = requests.Session()
+            self._session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        return self._session
     
     def set_recipient_email(self, recipient_email: str) -> None:
         """Set or change the recipient email address."""
@@ -41,107 +117,86 @@ class EmailSender:
     
     def generate_subject(self, topic_type: str, subtopic: str) -> str:
         """Generate email subject with next Friday's date."""
-        if topic_type == "":
-            date = datetime.now().strftime("%Y-%m-%d")
-            topic_type = ""
-        elif topic_type in ["Non-Onc", "Onc"]:
-            # Get next friday's date
-            date = (datetime.now() + timedelta((4 - datetime.now().weekday() + 7) % 7)).strftime("%Y-%m-%d")
-        elif topic_type == "No Date":
-            date = ""
-            topic_type = ""
-        else:
-            raise ValueError(f"Invalid topic type: {topic_type}")
+        try:
+            format_date, topic_label = _SUBJECT_DATES[topic_type]
+        except KeyError:
+            raise ValueError(f"Invalid topic type: {topic_type}") from None
 
-        str_list = [date, topic_type, subtopic]
-        str_list = [s for s in str_list if s]
-        return " ".join(str_list)
+        date = format_date(datetime.now())
+        return " ".join(filter(None, (date, topic_label, subtopic)))
     
-    def create_email_content(self, message_body: str, image_buffers: List[BytesIO]) -> str:
+    def create_email_content(self, message_body: str, pages: List[PageImage]) -> str:
         """Create HTML email content with inline images."""
-        html_content = f"<html><body>{message_body}<br><br>"
+        html_parts = [f"<html><body>{message_body}<br><br>"]
         
-        for i in range(len(image_buffers)):
-            html_content += f'<img src="cid:image{i+1}" style="max-width: 100%; height: auto;"><br>'
-            html_content += '<hr>'
+        for i in range(len(pages)):
+            html_parts.append(f'<img src="cid:image{i+1}" style="max-width: 100%; height: auto;"><br>')
+            html_parts.append('<hr>')
         
-        html_content += "</body></html>"
-        return html_content
+        html_parts.append("</body></html>")
+        return "".join(html_parts)
     
-    def compose_email(self, subject: str, message_body: str, image_buffers: List[BytesIO]) -> MIMEMultipart:
+    def compose_email(self, subject: str, message_body: str, pages: List[PageImage]) -> MIMEMultipart:
         """Compose email with images as attachments or embedded in HTML."""
-        if self.sender_type == "microsoft_graph":
-            if self.use_mime_attachments:
-                # For Microsoft Graph API with MIME attachments, create proper MIME message
-                msg = MIMEMultipart()
-                msg['From'] = self.sender_email
-                msg['To'] = self.recipient_email
-                msg['Subject'] = subject
-                
-                # Create HTML content with CID references
-                html_content = self.create_html_with_cid_references(message_body, image_buffers)
-                msg.attach(MIMEText(html_content, 'html'))
-                
-                # Add images as attachments with Content-ID headers
-                for i, buffer in enumerate(image_buffers):
-                    buffer.seek(0)
-                    img_data = buffer.getvalue()
-                    image = MIMEImage(img_data, name=f'page{i+1}.png')
-                    image.add_header('Content-ID', f'<page{i+1}>')
-                    msg.attach(image)
-                
-                return msg
-            else:
-                # Fallback to base64 encoding for smaller files
-                msg = MIMEMultipart()
-                msg['From'] = self.sender_email
-                msg['To'] = self.recipient_email
-                msg['Subject'] = subject
-                
-                # Create HTML content with embedded base64 images
-                html_content = self.create_html_with_images_microsoft_graph(message_body, image_buffers)
-                msg.attach(MIMEText(html_content, 'html'))
-                
-                return msg
-        else:
-            # For SMTP, use attachments
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = self.recipient_email
-            msg['Subject'] = subject
-            
-            # Add images as attachments
-            for i, buffer in enumerate(image_buffers):
-                buffer.seek(0)
-                img_data = buffer.getvalue()
-                image = MIMEImage(img_data, name=f'image{i+1}.png')
-                image.add_header('Content-ID', f'<image{i+1}>')
-                msg.attach(image)
-            
-            # Create and attach HTML content
-            html_content = self.create_email_content(message_body, image_buffers)
-            msg.attach(MIMEText(html_content, 'html'))
-            
-            return msg
+        return self._compose(subject, message_body, pages)
     
-    def send_email(self, msg: MIMEMultipart) -> bool:
+    def _new_message(self, subject: str) -> MIMEMultipart:
+        """Create an empty multipart message with the address and subject headers set."""
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = self.recipient_email
+        msg['Subject'] = subject
+        return msg
+    
+    def _compose_graph_mime(self, subject: str, message_body: str, pages: List[PageImage]) -> MIMEMultipart:
+        """Compose a MIME message with CID-referenced image attachments for Microsoft Graph."""
+        msg = self._new_message(subject)
+        
+        # Create HTML content with CID references
+        html_content = self.create_html_with_cid_references(message_body, pages)
+        msg.attach(MIMEText(html_content, 'html'))
+        
+        # Add images as attachments with Content-ID headers
+        for i, page in enumerate(pages):
+            image = MIMEImage(page.data, name=f'page{i+1}.png')
+            image.add_header('Content-ID', f'<page{i+1}>')
+            msg.attach(image)
+        
+        return msg
+    
+    def _compose_graph_base64(self, subject: str, message_body: str, pages: List[PageImage]) -> MIMEMultipart:
+        """Compose a message with base64 images embedded in the HTML for Microsoft Graph."""
+        msg = self._new_message(subject)
+        
+        # Create HTML content with embedded base64 images
+        html_content = self.create_html_with_images_microsoft_graph(message_body, pages)
+        msg.attach(MIMEText(html_content, 'html'))
+        
+        return msg
+    
+    def _compose_smtp(self, subject: str, message_body: str, pages: List[PageImage]) -> MIMEMultipart:
+        """Compose a message with images attached for SMTP."""
+        msg = self._new_message(subject)
+        
+        # Add images as attachments
+        for i, page in enumerate(pages):
+            image = MIMEImage(page.data, name=f'image{i+1}.png')
+            image.add_header('Content-ID', f'<image{i+1}>')
+            msg.attach(image)
+        
+        # Create and attach HTML content
+        html_content = self.create_email_content(message_body, pages)
+        msg.attach(MIMEText(html_content, 'html'))
+        
+        return msg
+    
+    def send_email(self, subject: str, message_body: str, pages: List[PageImage]) -> bool:
         """Send email via SMTP or Microsoft Graph API."""
-        if self.sender_type == "microsoft_graph":
-            # For Microsoft Graph, we need to pass the original image_buffers
-            # Extract them from the MIME message for now
-            image_buffers = []
-            for part in msg.walk():
-                if part.get_content_type().startswith('image/'):
-                    buffer = BytesIO(part.get_payload(decode=True))
-                    buffer.seek(0)
-                    image_buffers.append(buffer)
-            
-            if self.use_mime_attachments:
-                return self.send_email_microsoft_graph_with_attachments(msg, image_buffers)
-            else:
-                return self.send_email_microsoft_graph_simple(msg)
-        else:
-            return self.send_email_smtp(msg)
+        return self._send(subject, message_body, pages)
+    
+    def _send_smtp(self, subject: str, message_body: str, pages: List[PageImage]) -> bool:
+        """Compose the SMTP message and send it."""
+        return self.send_email_smtp(self._compose_smtp(subject, message_body, pages))
     
     def send_email_smtp(self, msg: MIMEMultipart) -> bool:
         """Send email via SMTP."""
@@ -165,31 +220,24 @@ class EmailSender:
             st.error(f"An error occurred while sending email: {e}")
             return False
     
-    def send_email_microsoft_graph_with_attachments(self, msg: MIMEMultipart, image_buffers: List[BytesIO]) -> bool:
+    def send_email_microsoft_graph_with_attachments(self, subject: str, message_body: str, pages: List[PageImage]) -> bool:
         """Send email via Microsoft Graph API using inline attachments with sendMail endpoint."""
+        import requests
+        
         try:
             token = self.acquire_microsoft_graph_token()
             
-            # Extract subject and body from the MIME message
-            subject = msg['Subject']
-            
-            # Get the HTML content from the message
-            html_content = ""
-            for part in msg.walk():
-                if part.get_content_type() == "text/html":
-                    html_content = part.get_payload(decode=True).decode()
-                    break
+            # Create HTML content with CID references to the inline attachments
+            html_content = self.create_html_with_cid_references(message_body, pages)
             
-            # Prepare attachments for inline use using the original image_buffers
+            # Prepare attachments for inline use
             attachments = []
-            for i, buffer in enumerate(image_buffers):
-                buffer.seek(0)
-                
+            for i, page in enumerate(pages):
                 attachment = {
                     "@odata.type": "#microsoft.graph.fileAttachment",
                     "name": f"page{i+1}.png",
                     "contentType": "image/png",
-                    "contentBytes": base64.b64encode(buffer.getvalue()).decode(),
+                    "contentBytes": page.b64,
                     "contentId": f"page{i+1}",
                     "isInline": True
                 }
@@ -211,7 +259,7 @@ class EmailSender:
                 "Content-Type": "application/json",
             }
             
-            response = requests.post(url, headers=headers, data=json.dumps(payload))
+            response = self._get_session().post(url, headers=headers, data=_json_dumps(payload))
             response.raise_for_status()
             
             return True
@@ -223,18 +271,13 @@ class EmailSender:
             st.error(f"An error occurred while sending email via Microsoft Graph with attachments: {e}")
             return False
     
-    def send_email_microsoft_graph_simple(self, msg: MIMEMultipart) -> bool:
+    def send_email_microsoft_graph_simple(self, subject: str, message_body: str, pages: List[PageImage]) -> bool:
         """Send email via Microsoft Graph API using simple approach (base64 encoded)."""
+        import requests
+        
         try:
-            # Extract subject and body from the MIME message
-            subject = msg['Subject']
-            
-            # Get the HTML content from the message
-            html_content = ""
-            for part in msg.walk():
-                if part.get_content_type() == "text/html":
-                    html_content = part.get_payload(decode=True).decode()
-                    break
+            # Create HTML content with embedded base64 images
+            html_content = self.create_html_with_images_microsoft_graph(message_body, pages)
             
             payload = {
                 "message": {
@@ -251,7 +294,7 @@ class EmailSender:
                 "Content-Type": "application/json",
             }
             
-            response = requests.post(url, headers=headers, data=json.dumps(payload))
+            response = self._get_session().post(url, headers=headers, data=_json_dumps(payload))
             response.raise_for_status()
             
             return True
@@ -263,7 +306,7 @@ class EmailSender:
             st.error(f"An error occurred while sending email: {e}")
             return False
     
-    def preview_email(self, subject: str, message_body: str, image_buffers: List[BytesIO]) -> None:
+    def preview_email(self, subject: str, message_body: str, pages: List[PageImage]) -> None:
         """Display email preview in Streamlit."""
         with st.expander("Preview of Email Content"):
             # Display subject
@@ -274,19 +317,21 @@ class EmailSender:
             st.write(message_body)
             
             # Display images
-            if image_buffers:
-                for i, buffer in enumerate(image_buffers):
-                    buffer.seek(0)
-                    st.image(buffer, caption=f"Image {i+1}", use_column_width=True)
-                    if i < len(image_buffers) - 1:
+            if pages:
+                for i, page in enumerate(pages):
+                    st.image(page.data, caption=f"Image {i+1}", width="stretch")
+                    if i < len(pages) - 1:
                         st.markdown("---")
     
     def acquire_microsoft_graph_token(self) -> str:
-        """Acquire access token for Microsoft Graph API."""
-        app = msal.ConfidentialClientApplication(
+        """Acquire access token for Microsoft Graph API, reusing it until shortly before expiry."""
+        if self._token and time.time() < self._token_expiry - 60:
+            return self._token
+        
+        app = _get_msal_app(
+            self.microsoft_tenant_id,
             self.microsoft_client_id,
-            authority=f"https://login.microsoftonline.com/{self.microsoft_tenant_id}",
-            client_credential=self.microsoft_client_secret,
+            self.microsoft_client_secret,
         )
         result = app.acquire_token_for_client(
             scopes=["https://graph.microsoft.com/.default"]
@@ -295,31 +340,30 @@ class EmailSender:
             raise RuntimeError(
                 f"Token request failed: {result.get('error')}\n{result.get('error_description')}"
             )
-        return result["access_token"]
+        self._token = result["access_token"]
+        self._token_expiry = time.time() + result.get("expires_in", 0)
+        return self._token
     
-    def create_html_with_cid_references(self, message_body: str, image_buffers: List[BytesIO]) -> str:
+    def create_html_with_cid_references(self, message_body: str, pages: List[PageImage]) -> str:
         """Create HTML content with CID references for MIME attachments."""
         html_parts = [f"<p>{message_body}</p>"]
         
-        for i in range(len(image_buffers)):
+        for i in range(len(pages)):
             html_parts.append(f'<img src="cid:page{i+1}" style="max-width: 100%; height: auto; margin: 10px 0;" alt="Page {i+1}">')
             
-            if i < len(image_buffers) - 1:
+            if i < len(pages) - 1:
                 html_parts.append('<hr>')
         
         return "".join(html_parts)
     
-    def create_html_with_images_microsoft_graph(self, message_body: str, image_buffers: List[BytesIO]) -> str:
+    def create_html_with_images_microsoft_graph(self, message_body: str, pages: List[PageImage]) -> str:
         """Create HTML content with base64 encoded images for Microsoft Graph API."""
         html_parts = [f"<p>{message_body}</p>"]
         
-        for i, buffer in enumerate(image_buffers):
-            buffer.seek(0)
-            img_data = buffer.getvalue()
-            img_base64 = base64.b64encode(img_data).decode()
-            html_parts.append(f'<img src="data:image/png;base64,{img_base64}" style="max-width: 100%; height: auto; margin: 10px 0;" alt="Page {i+1}">')
+        for i, page in enumerate(pages):
+            html_parts.append(f'<img src="data:image/png;base64,{page.b64}" style="max-width: 100%; height: auto; margin: 10px 0;" alt="Page {i+1}">')
             
-            if i < len(image_buffers) - 1:
+            if i < len(pages) - 1:
                 html_parts.append('<hr>')
         
         return "".join(html_parts)
@@ -6,7 +6,9 @@ Run with: streamlit run src/main.py
 """
 
 import streamlit as st
+from io import BytesIO
 from pathlib import Path
+from typing import List, Tuple
 import sys
 import os
 
@@ -15,7 +17,15 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import APP_CONFIG, validate_config, EMAIL_CONFIG
 from pdf_converter import PDFConverter
-from email_sender import EmailSender
+from email_sender import EmailSender, PageImage
+
+# Maximum image size options and each option's position in the dropdown
+SIZE_CHOICES = [(600, 600), (800, 800), (1024, 1024), (1280, 1280)]
+SIZE_INDEX = {size: i for i, size in enumerate(SIZE_CHOICES)}
+
+# Sending method, fixed once secrets are loaded at import
+SENDER_TYPE = EMAIL_CONFIG["sender_type"]
+USE_MIME_ATTACHMENTS = EMAIL_CONFIG["use_mime_attachments"]
 
 
 def setup_page():
@@ -99,12 +109,11 @@ export USE_MIME_ATTACHMENTS="true"  # or "false"
         st.stop()
     
     # Show current sender type
-    sender_type = EMAIL_CONFIG["sender_type"]
-    if sender_type == "microsoft_graph":
-        attachment_method = "Inline attachments" if EMAIL_CONFIG["use_mime_attachments"] else "Base64 encoding"
+    if SENDER_TYPE == "microsoft_graph":
+        attachment_method = "Inline attachments" if USE_MIME_ATTACHMENTS else "Base64 encoding"
         st.info(f"📧 Using Microsoft Graph API for email sending ({attachment_method})")
     else:
-        st.info(f"📧 Using {sender_type.upper()} SMTP for email sending")
+        st.info(f"📧 Using {SENDER_TYPE.upper()} SMTP for email sending")
 
 
 def create_email_form():
@@ -162,14 +171,12 @@ def handle_file_upload():
     max_size = APP_CONFIG["max_image_size"]
     quality = APP_CONFIG["image_quality"]
     col1, col2 = st.columns(2)
-    tuple_compare = lambda x, y: x[0] == y[0] and x[1] == y[1]
-    size_choices = [(600, 600),(800, 800), (1024, 1024), (1280, 1280)]
     
     with col1:
         max_size = st.selectbox(
             "Select maximum image size",
-            size_choices,
-            index=[i for i in range(len(max_size)) if tuple_compare(size_choices[i], max_size)][0],
+            SIZE_CHOICES,
+            index=SIZE_INDEX.get(tuple(max_size), 1),
             help="Choose the maximum size for the converted images"
         )
     
@@ -184,7 +191,7 @@ def handle_file_upload():
         )
 
     if uploaded_file is not None:
-        converter = PDFConverter(quality=quality, max_size= max_size)
+        converter = get_converter(quality, tuple(max_size))
         
         # Validate file
         is_valid, error_message = converter.validate_file(uploaded_file)
@@ -195,13 +202,14 @@ def handle_file_upload():
         # Convert PDF to images
         with st.spinner("Converting PDF to images..."):
             try:
-                image_buffers = converter.convert_pdf_to_images(uploaded_file)
-                st.success(f"Successfully converted {len(image_buffers)} pages")
+                page_images = convert_pdf_cached(uploaded_file.getvalue(), quality, tuple(max_size))
+                pages = [PageImage(data) for data in page_images]
+                st.success(f"Successfully converted {len(pages)} pages")
                 
                 # Display images
-                #converter.display_images(image_buffers)
+                #converter.display_images([BytesIO(page.data) for page in pages])
                 
-                return image_buffers
+                return pages
                 
             except Exception as e:
                 st.error(f"Error converting PDF: {e}")
@@ -210,6 +218,36 @@ def handle_file_upload():
     return None
 
 
+@st.cache_resource
+def get_converter(quality: int, max_size: Tuple[int, int]) -> PDFConverter:
+    """Return a shared PDFConverter for the given quality and size settings."""
+    return PDFConverter(quality=quality, max_size=max_size)
+
+
+@st.cache_data(show_spinner=False, max_entries=4, ttl=3600)
+def convert_pdf_cached(pdf_bytes: bytes, quality: int, max_size: Tuple[int, int]) -> List[bytes]:
+    """
+    Convert PDF bytes to per-page image bytes, cached across reruns.
+    
+    Streamlit reruns the script on every widget change; keyed on the PDF
+    content and conversion settings, only the first run pays for rendering.
+    Plain bytes are returned since they pickle much faster than BytesIO.
+    """
+    converter = get_converter(quality, max_size)
+    return [buffer.getvalue() for buffer in converter.convert_pdf_to_images(BytesIO(pdf_bytes))]
+
+
+@st.cache_resource
+def get_email_sender(recipient_email: str) -> EmailSender:
+    """
+    Return a shared EmailSender for the recipient.
+    
+    Cached per process so the MSAL token and HTTP session it holds are
+    reused across reruns and sessions instead of rebuilt on every event.
+    """
+    return EmailSender(recipient_email)
+
+
 def main():
     """Main application function."""
     setup_page()
@@ -219,17 +257,17 @@ def main():
     
     # Create email form
     topic_type, subtopic, message_body, recipient_email = create_email_form()
-    email_sender = EmailSender(recipient_email)
+    email_sender = get_email_sender(recipient_email)
     subject = email_sender.generate_subject(topic_type, subtopic)
 
     # Display subject
     st.info(f"**Subject:** {subject}")
     
     # Handle file upload
-    image_buffers = handle_file_upload()
+    pages = handle_file_upload()
     
     # Send email button
-    if image_buffers:
+    if pages:
         col1, col2 = st.columns([6, 1])
         
         with col1:
@@ -238,27 +276,23 @@ def main():
         with col2:
             # Send button
             send_button = st.button("Send Email", type="primary", help="Click to send the email", key="send_email_button", 
-                         use_container_width=True)
+                         width="stretch")
             if send_button:
                 with st.spinner("Sending email..."):
-                    msg = email_sender.compose_email(subject, message_body, image_buffers)
+                    email_sent = email_sender.send_email(subject, message_body, pages)
                     
         # Start of Selection
-        if send_button and email_sender.send_email(msg):
+        if send_button and email_sent:
             st.success("✅ Email sent successfully!")
         elif send_button:
             st.error("❌ Failed to send email. Please check the error messages above.")
         else:
             pass
         
-        # Generate subject
-        email_sender = EmailSender(recipient_email)
-        subject = email_sender.generate_subject(topic_type, subtopic)
-        
         # Preview email
-        email_sender.preview_email(subject, message_body, image_buffers)
+        email_sender.preview_email(subject, message_body, pages)
     
-    elif image_buffers and (not message_body or not subtopic):
+    elif pages and (not message_body or not subtopic):
         st.warning("Please fill in the message body and subtopic to send an email.")
     
     # Footer
@@ -4,20 +4,20 @@ PDF conversion utilities for the email app.
 from pathlib import Path
 from typing import List, Tuple
 from io import BytesIO
-from PIL import Image
-from pdf2image import convert_from_path, convert_from_bytes
+import pymupdf
 import streamlit as st
-import tempfile
-import os
 
 from config import APP_CONFIG
 
+# Resolution pdf2image/Poppler rendered at; never rasterize above it
+MAX_RENDER_DPI = 200
+
 
 class PDFConverter:
     """Handles PDF to image conversion."""
     
     def __init__(self, quality: int = 85, max_size: Tuple[int, int] = (800, 800)):
-        self.supported_types = APP_CONFIG["supported_file_types"]
+        self.supported_types = frozenset(t.lower() for t in APP_CONFIG["supported_file_types"])
         self.max_size = max_size
         self.quality = quality
         self.format = APP_CONFIG["image_format"]
@@ -38,6 +38,16 @@ class PDFConverter:
         
         return True, ""
     
+    def _render_scale(self, rect: pymupdf.Rect) -> float:
+        """
+        Zoom factor that rasterizes a page directly at its thumbnail size.
+        
+        Mirrors Image.thumbnail(self.max_size): fit within both bounds keeping
+        the aspect ratio, and never render above MAX_RENDER_DPI.
+        """
+        max_width, max_height = self.max_size
+        return min(max_width / rect.width, max_height / rect.height, MAX_RENDER_DPI / 72)
+    
     def convert_pdf_to_images(self, uploaded_file) -> List[BytesIO]:
         """
         Convert PDF file to list of image buffers.
@@ -48,45 +58,39 @@ class PDFConverter:
         Returns:
             List of BytesIO buffers containing converted images
         """
-        # Create a temporary file with proper cleanup
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-            # Write uploaded file content to temporary file
-            temp_file.write(uploaded_file.read())
-            temp_file_path = temp_file.name
+        # getvalue() returns the upload's in-memory bytes regardless of the
+        # stream position, so a previously read upload still converts
+        pdf_bytes = uploaded_file.getvalue()
         
+        # Render in-process with MuPDF straight from the uploaded bytes
+        doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
         try:
-            # Convert PDF to images
-            images = convert_from_path(temp_file_path)
-            
-            # Process images
-            image_buffers = []
-            for i, img in enumerate(images):
-                buffer = BytesIO()
-                
-                # Resize image
-                img.thumbnail(self.max_size)
-                
-                # Save to buffer
-                img.save(buffer, format=self.format, quality=self.quality)
-                buffer.seek(0)
-                image_buffers.append(buffer)
-            
-            return image_buffers
-            
+            return [BytesIO(self._render_page(page)) for page in doc]
         finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_file_path)
-            except OSError:
-                # File might already be deleted or not accessible
-                pass
+            doc.close()
+    
+    def _render_page(self, page: pymupdf.Page) -> bytes:
+        """Rasterize one page at its thumbnail size and encode it."""
+        scale = self._render_scale(page.rect)
+        pix = page.get_pixmap(
+            matrix=pymupdf.Matrix(scale, scale),
+            colorspace=pymupdf.csRGB,
+            alpha=False,
+            annots=True,
+        )
+        
+        # Encode the pixmap directly, no PIL round-trip
+        return pix.tobytes(output=self.format.lower(), jpg_quality=self.quality)
     
     def display_images(self, image_buffers: List[BytesIO]) -> None:
         """Display converted images in Streamlit."""
         st.write("Converted Images:")
         
         with st.expander("Click to view converted images"):
-            for i, buffer in enumerate(image_buffers):
-                buffer.seek(0)
-                img = Image.open(buffer)
-                st.image(img, caption=f"Page {i+1}", use_column_width=True) 
\ No newline at end of file
+            # Pass the encoded buffers to Streamlit in one call rather than
+            # decoding each page into a PIL image first
+            st.image(
+                image_buffers,
+                caption=[f"Page {i+1}" for i in range(len(image_buffers))],
+                width="stretch",
+            )
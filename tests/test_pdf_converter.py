@@ -0,0 +1,73 @@
+"""
+Tests for PDF to image conversion.
+
+Builds small PDFs in memory with PyMuPDF and checks the rendered pages.
+
+Run from the project root directory:
+    python -m pytest tests/test_pdf_converter.py
+"""
+
+import os
+import sys
+from io import BytesIO
+
+import pymupdf
+from PIL import Image
+
+# Add the src directory to Python path for direct imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from pdf_converter import PDFConverter
+
+LETTER = (612, 792)
+
+
+def make_pdf(page_sizes) -> BytesIO:
+    """Create an in-memory PDF with one page per (width, height) in points."""
+    doc = pymupdf.open()
+    for width, height in page_sizes:
+        page = doc.new_page(width=width, height=height)
+        page.insert_text((20, 20), "test page")
+    pdf = BytesIO(doc.tobytes())
+    doc.close()
+    return pdf
+
+
+def test_convert_returns_one_png_per_page():
+    """Each page becomes one buffer in the configured image format."""
+    converter = PDFConverter(quality=75, max_size=(800, 800))
+    buffers = converter.convert_pdf_to_images(make_pdf([LETTER, LETTER, LETTER]))
+
+    assert len(buffers) == 3
+    for buffer in buffers:
+        assert Image.open(buffer).format == "PNG"
+
+
+def test_pages_fit_within_max_size():
+    """Portrait, landscape and tall pages all fit inside max_size."""
+    max_size = (800, 600)
+    converter = PDFConverter(quality=75, max_size=max_size)
+    buffers = converter.convert_pdf_to_images(make_pdf([LETTER, LETTER[::-1], (612, 2000)]))
+
+    for buffer in buffers:
+        width, height = Image.open(buffer).size
+        assert width <= max_size[0] and height <= max_size[1]
+        # The image fills the box along at least one side
+        assert width == max_size[0] or height == max_size[1]
+
+
+def test_letter_page_size_at_800():
+    """Pin the rendered size (Image.thumbnail gave 618x800 for the same page)."""
+    converter = PDFConverter(quality=75, max_size=(800, 800))
+    buffers = converter.convert_pdf_to_images(make_pdf([LETTER]))
+
+    assert Image.open(buffers[0]).size == (619, 800)
+
+
+def test_small_pages_are_not_upscaled():
+    """Pages smaller than max_size render at no more than 200 DPI."""
+    converter = PDFConverter(quality=75, max_size=(800, 800))
+    buffers = converter.convert_pdf_to_images(make_pdf([(100, 50)]))
+
+    assert Image.open(buffers[0]).size == (278, 139)